@@ -1,102 +1,195 @@
-import json
+import mmap
 import os
 import re
-from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional
 
 from config import *
+from json_utils import dumps_json, loads_json, orjson
+
+# Od této velikosti se vstupní JSON parsuje přímo z mmap (bez kopie do bytes)
+_MMAP_THRESHOLD = 4 * 1024 * 1024
+
+# Kód specializace v závorkách (např. --- (AM1) → AM1)
+_RE_SPEC_CODE = re.compile(r"\(([^)]+)\)")
+
+
+# ------------------------------------------------------------------
+# Načítání / ukládání JSON
+# ------------------------------------------------------------------
+
+def _load_json(path: str):
+    """Načte JSON soubor (přes orjson, pokud je k dispozici).
+
+    Soubor se čte binárně – oba parsery přijímají UTF-8 bajty přímo.
+    Velké soubory předá orjson přímo stránky z page cache přes mmap,
+    bez kopírování celého obsahu do nového bytes objektu.
+    """
+    with open(path, "rb") as f:
+        if orjson is not None and os.fstat(f.fileno()).st_size > _MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                    memoryview(mm) as view:
+                return orjson.loads(view)
+        raw = f.read()
+    return loads_json(raw)
+
+
+def _dump_json(path: str, data, pretty: bool = False) -> None:
+    """Uloží data jako JSON – celý obsah se zapíše jedním voláním write().
+
+    Zápis je atomický (dočasný soubor + os.replace), čtenář tak nikdy
+    neuvidí rozepsaný soubor.
+    """
+    payload = dumps_json(data, pretty)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def _dump_json_list(path: str, items: Iterable, pretty: bool = False) -> int:
+    """Uloží JSON pole po jednotlivých prvcích a vrátí jejich počet.
+
+    Výstup je bajtově shodný s _dump_json(path, list(items), pretty), ale
+    v paměti je vždy jen serializace jednoho prvku. Při odsazeném výstupu se
+    prvky odsadí o další úroveň nahrazením zalomení řádků – uvnitř JSON
+    řetězců jsou vždy escapovaná. Zápis je atomický jako u _dump_json.
+    """
+    if pretty:
+        first, sep, end, empty = b"[\n  ", b",\n  ", b"\n]", b"[]"
+    else:
+        first, sep, end, empty = b"[", b",", b"]", b"[]"
+    count = 0
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        for item in items:
+            f.write(sep if count else first)
+            payload = dumps_json(item, pretty)
+            f.write(payload.replace(b"\n", b"\n  ") if pretty else payload)
+            count += 1
+        f.write(end if count else empty)
+    os.replace(tmp_path, path)
+    return count
 
 
 class DataAnalyst:
     """Analýza studijních plánů – seskupení podle fakult."""
 
+    MAX_WORKERS = 4
+
+    def __init__(self, pretty: bool = False):
+        # Výstup je určen pro strojové zpracování – odsazení jen na vyžádání
+        self.pretty = pretty
+
     # ------------------------------------------------------------------
     # Veřejné rozhraní
     # ------------------------------------------------------------------
 
     def run(self):
-        """Spustí analýzu pro obě jazykové verze (cs-CS i en-US)."""
-        for lang in LANGUAGES:
-            self._process_language(lang)
-            self._export_subjects(lang)
+        """Spustí analýzu pro obě jazykové verze (cs-CS i en-US).
+
+        Export programů i předmětů obou jazyků běží souběžně ve vláknech –
+        práce je vázaná převážně na zápis souborů.
+        """
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            futures = []
+            for lang in LANGUAGES:
+                plans = self._load_plans(lang)
+                if plans is None:
+                    continue
+                futures.append(executor.submit(self._process_language, lang, plans))
+                futures.append(executor.submit(self._export_subjects, lang, plans))
+            for future in futures:
+                future.result()
 
     # ------------------------------------------------------------------
     # Interní metody
     # ------------------------------------------------------------------
 
-    def _process_language(self, language: str):
-        """Zpracuje jednu jazykovou verzi studijních plánů."""
-        input_path = get_study_plans_output(language)
-        output_path = get_study_programmes_output(language)
+    def _load_plans(self, language: str) -> Optional[list[dict]]:
+        """Načte studijní plány jedné jazykové verze (jednou pro všechny exporty).
+
+        Vrací None, pokud vstupní soubor neexistuje.
+        """
+        input_path = get_lang_paths(language).study_plans_output
 
-        # Kontrola existence vstupního souboru
-        if not os.path.isfile(input_path):
+        # Chybějící soubor pozná přímo open() – bez samostatného stat()
+        try:
+            return _load_json(input_path)
+        except FileNotFoundError:
             print(f"[WARN] Soubor '{input_path}' neexistuje – přeskakuji ({language}).")
-            return
+            return None
 
-        # Načtení dat
-        with open(input_path, "r", encoding="utf-8") as f:
-            plans: list[dict] = json.load(f)
+    def _process_language(self, language: str, plans: list[dict]):
+        """Zpracuje jednu jazykovou verzi studijních plánů."""
+        output_path = get_lang_paths(language).study_programmes_output
 
         # Seskupení podle fakulty
         grouped = self._group_by_faculty(plans)
 
         # Uložení výstupu
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(grouped, f, ensure_ascii=False, indent=2)
+        faculty_count = _dump_json_list(output_path, grouped, self.pretty)
 
-        print(f"[OK] Vytvořen soubor '{output_path}' – {len(grouped)} fakult, jazyk: {language}")
+        print(f"[OK] Vytvořen soubor '{output_path}' – {faculty_count} fakult, jazyk: {language}")
 
-    def _export_subjects(self, language: str):
+    def _export_subjects(self, language: str, plans: list[dict]):
         """Exportuje předměty pro každý studijní plán do samostatných souborů.
 
         Struktura výstupu:
           - Bez specializace: {subjects_dir}/{zkratka_programu}.json
           - Se specializací:  {subjects_dir}/{zkratka_programu}/{kod_specializace}.json
         """
-        input_path = get_study_plans_output(language)
-        subjects_dir = get_subjects_dir(language)
-
-        if not os.path.isfile(input_path):
-            print(f"[WARN] Soubor '{input_path}' neexistuje – přeskakuji export předmětů ({language}).")
-            return
-
-        with open(input_path, "r", encoding="utf-8") as f:
-            plans: list[dict] = json.load(f)
+        subjects_dir = get_lang_paths(language).subjects_dir
 
+        # Každá složka se vytváří nejvýše jednou – makedirs() volá stat()
+        # na každou komponentu cesty.
         os.makedirs(subjects_dir, exist_ok=True)
+        created_dirs: set[str] = {subjects_dir}
 
-        file_count = 0
+        # Cesty se určují sekvenčně: více plánů může mířit do stejného souboru
+        # a platí ten poslední (stejně jako při postupném zápisu).
+        files: dict[str, list] = {}
+        # Cesty se skládají přímo z prefixu (bez os.path.join pro každý plán);
+        # "/" funguje jako oddělovač i na Windows.
+        prefix = subjects_dir.rstrip("/") + "/"
         for plan in plans:
-            zkratka = plan.get("zkratka_programu", "UNKNOWN")
-            raw_spec = plan.get("specializace", "")
-            predmety = plan.get("predmety", [])
+            g = plan.get
+            zkratka = g("zkratka_programu", "UNKNOWN")
+            raw_spec = g("specializace", "")
+            predmety = g("predmety", [])
 
-            if raw_spec and ":" in raw_spec:
+            spec_code, sep, _ = (raw_spec or "").partition(":")
+            if sep:
                 # Se specializací → složka programu / soubor specializace
-                spec_code = raw_spec.split(":", 1)[0].strip()
+                spec_code = spec_code.strip()
                 # Extrakce kódu ze závorek (např. --- (AM1) → AM1)
-                match = re.search(r'\(([^)]+)\)', spec_code)
+                match = _RE_SPEC_CODE.search(spec_code)
                 if match:
                     spec_code = match.group(1).strip()
-                dir_path = os.path.join(subjects_dir, zkratka)
-                os.makedirs(dir_path, exist_ok=True)
-                file_path = os.path.join(dir_path, f"{spec_code}.json")
+                dir_path = f"{prefix}{zkratka}"
+                if dir_path not in created_dirs:
+                    os.makedirs(dir_path, exist_ok=True)
+                    created_dirs.add(dir_path)
+                file_path = f"{dir_path}/{spec_code}.json"
             else:
                 # Bez specializace → přímo soubor
-                file_path = os.path.join(subjects_dir, f"{zkratka}.json")
+                file_path = f"{prefix}{zkratka}.json"
+
+            files[file_path] = predmety
 
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(predmety, f, ensure_ascii=False, indent=2)
-            file_count += 1
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            list(executor.map(
+                lambda item: _dump_json(*item, self.pretty), files.items()
+            ))
 
-        print(f"[OK] Exportováno {file_count} souborů předmětů do '{subjects_dir}', jazyk: {language}")
+        print(f"[OK] Exportováno {len(files)} souborů předmětů do '{subjects_dir}', jazyk: {language}")
 
     @staticmethod
-    def _group_by_faculty(plans: list[dict]) -> list[dict]:
+    def _group_by_faculty(plans: list[dict]) -> Iterator[dict]:
         """Seskupí studijní plány podle zkratky fakulty.
 
-        Vrací seznam objektů:
+        Postupně vrací (generuje) objekty:
         {
             "zkratka_fakulty": "...",
             "fakulta": "...",
@@ -113,64 +206,76 @@ class DataAnalyst:
             ]
         }
         """
-        faculties: OrderedDict[str, dict] = OrderedDict()
+        faculties: dict[str, dict] = {}
 
         for plan in plans:
-            key = plan.get("zkratka_fakulty", "UNKNOWN")
+            g = plan.get
+            key = g("zkratka_fakulty", "UNKNOWN")
 
-            if key not in faculties:
-                faculties[key] = {
+            faculty = faculties.get(key)
+            if faculty is None:
+                faculty = faculties[key] = {
                     "zkratka_fakulty": key,
-                    "fakulta": plan.get("fakulta", ""),
+                    "fakulta": g("fakulta", ""),
                     "programy": [],
                 }
+            programy_list = faculty["programy"]
 
-            raw_spec = plan.get("specializace", "")
-            if raw_spec and ":" in raw_spec:
-                spec_code, spec_name = raw_spec.split(":", 1)
+            raw_spec = g("specializace", "")
+            nazev_programu = g("nazev_programu", "")
+            spec_code, sep, spec_name = (raw_spec or "").partition(":")
+            if sep:
                 spec_code = spec_code.strip()
                 # Extrakce kódu ze závorek (např. --- (AM1) → AM1)
-                match = re.search(r'\(([^)]+)\)', spec_code)
+                match = _RE_SPEC_CODE.search(spec_code)
                 if match:
                     spec_code = match.group(1).strip()
                 specializace = spec_code
-                nazev = f"{plan.get('nazev_programu', '')} - {spec_name.strip()}"
+                nazev = f"{nazev_programu} - {spec_name.strip()}"
             else:
                 specializace = raw_spec
-                nazev = plan.get("nazev_programu", "")
+                nazev = nazev_programu
+
+            if specializace and specializace.lower() == "bez specializace":
+                specializace = None
+
+            # Extrakce pouze čísla z doby studia (např. "3 roky" → "3")
+            duration = g("doba_studia", "")
+            duration = duration.partition(" ")[0] if duration else None
 
+            # Všechny klíče v jednom literálu (v pořadí výstupu); volitelné
+            # hodnoty, které chybí, se odfiltrují jedním průchodem.
             program_entry = {
-                "zkratka_programu": plan.get("zkratka_programu", ""),
+                "zkratka_programu": g("zkratka_programu", ""),
                 "nazev_programu": nazev,
-                "url": plan.get("url_planu", ""),
+                "url": g("url_planu", ""),
+                "specializace": specializace or None,
+                "doba_studia": duration,
+                "typ_studia": g("typ_studia", "") or None,
+                "kredity": g("kredity", "") or None,
             }
-            
-            if specializace and specializace.lower() != "bez specializace":
-                program_entry["specializace"] = specializace
-            
-            # Přidání standardní doby studia, pokud existuje
-            duration = plan.get("doba_studia", "")
-            if duration:
-                duration = duration.split(" ")[0]  # Extrakce pouze čísla (např. "3 roky" → "3")
-                program_entry["doba_studia"] = duration
-
-            study_type = plan.get("typ_studia", "")
-            if study_type:
-                program_entry["typ_studia"] = study_type
-            
-            # Přidání kreditů, pokud existují
-            credits = plan.get("kredity", "")
-            if credits:
-                program_entry["kredity"] = credits
-            
-            faculties[key]["programy"].append(program_entry)
-
-        return list(faculties.values())
+            program_entry = {k: v for k, v in program_entry.items() if v is not None}
+
+            programy_list.append(program_entry)
+
+        yield from faculties.values()
 
 
 # ------------------------------------------------------------------
 # Přímé spuštění
 # ------------------------------------------------------------------
 if __name__ == "__main__":
-    analyst = DataAnalyst()
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="VUT Data Analyst – tvorba výstupních JSON souborů"
+    )
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Odsadit výstupní JSON (default: kompaktní výstup)",
+    )
+    args = parser.parse_args()
+
+    analyst = DataAnalyst(pretty=args.pretty)
     analyst.run()
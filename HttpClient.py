@@ -1,7 +1,44 @@
+import asyncio
 import random
 import time
 import requests
-from typing import Optional
+from requests.adapters import HTTPAdapter
+from typing import Callable, List, Optional
+from urllib3.util.retry import Retry
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp je potřeba jen pro AsyncHttpClient
+    aiohttp = None
+
+# ---------------------------------------------------------------------------
+# Společné nastavení obou klientů
+# ---------------------------------------------------------------------------
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/124.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "cs,en;q=0.9",
+    # Accept-Encoding se záměrně nenastavuje: requests (urllib3) i aiohttp
+    # nabízí gzip/deflate a s nainstalovaným balíčkem brotli i br – jen
+    # kódování, která umí samy dekódovat.
+}
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def _report_error(
+    on_error: Optional[Callable[[str, str], None]], url: str, message: str
+) -> None:
+    """Předá chybovou hlášku příjemci on_error, nebo ji rovnou vypíše."""
+    if on_error is None:
+        print(message)
+    else:
+        on_error(url, message)
+
 
 # ---------------------------------------------------------------------------
 # HTTP klient s retry a delay logikou
@@ -10,43 +47,172 @@ from typing import Optional
 class HttpClient:
     """Obaluje requests s User-Agent, random delay a retry logikou."""
 
-    HEADERS = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/124.0.0.0 Safari/537.36"
-        ),
-        "Accept-Language": "cs,en;q=0.9",
-    }
-
-    def __init__(self, delay_range: tuple = (2.0, 5.0), max_retries: int = 3):
+    def __init__(
+        self,
+        delay_range: tuple = (2.0, 5.0),
+        max_retries: int = 3,
+        on_error: Optional[Callable[[str, str], None]] = None,
+    ):
         self.delay_range = delay_range
         self.max_retries = max_retries
+        # Příjemce chybových hlášek on_error(url, zpráva); bez něj se vypisují
+        self.on_error = on_error
         self.session = requests.Session()
-        self.session.headers.update(self.HEADERS)
+        self.session.headers.update(HEADERS)
 
-    def delay(self) -> None:
-        """Náhodné zpoždění mezi požadavky."""
-        wait = random.uniform(*self.delay_range)
-        time.sleep(wait)
+        # Opakování řeší urllib3 přímo v adaptéru (exponenciální backoff,
+        # respektuje Retry-After) a spojení zůstávají v poolu mezi pokusy.
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=1.0,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["GET"]),
+        )
+        adapter = HTTPAdapter(
+            max_retries=retry, pool_connections=16, pool_maxsize=32
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
-    def get(self, url: str, delay: bool = True) -> Optional[requests.Response]:
+        # Nejbližší okamžik (time.monotonic), kdy smí odejít další požadavek
+        self._next_allowed = 0.0
+
+    def wait_turn(self) -> None:
+        """Počká, dokud neuplyne náhodný interval od předchozího požadavku."""
+        wait = self._next_allowed - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+    def mark_request(self) -> None:
+        """
+        Započte odeslaný požadavek – další smí odejít až po náhodném
+        intervalu z delay_range. Volá se i po požadavcích odeslaných
+        mimo tento klient (např. dávka přes AsyncHttpClient).
+        """
+        self._next_allowed = (
+            max(time.monotonic(), self._next_allowed)
+            + random.uniform(*self.delay_range)
+        )
+
+    def _throttle(self) -> None:
         """
-        Stáhne URL s retry logikou.
+        Rozestupy mezi požadavky: čeká jen zbytek náhodného intervalu od
+        předchozího požadavku. Čas strávený zpracováním odpovědi se tak
+        do zpoždění započítá a nečeká se zbytečně.
+        """
+        self.wait_turn()
+        self.mark_request()
+
+    def get(self, url: str) -> Optional[requests.Response]:
+        """
+        Stáhne URL; opakování při chybě zajišťuje adaptér session.
+
+        Požadavky jsou automaticky rozestoupeny o náhodný interval
+        z delay_range (viz _throttle).
 
         Returns:
             Response objekt nebo None pokud všechny pokusy selhaly.
         """
-        for attempt in range(1, self.max_retries + 1):
-            try:
-                if delay and attempt > 1:
-                    self.delay()
-                resp = self.session.get(url, timeout=30)
-                resp.raise_for_status()
-                resp.encoding = "utf-8"
-                return resp
-            except requests.RequestException as e:
-                print(f"    ✗ Pokus {attempt}/{self.max_retries} selhal pro {url}: {e}")
-                if attempt < self.max_retries:
-                    self.delay()
+        self._throttle()
+        try:
+            resp = self.session.get(url, timeout=30)
+            resp.raise_for_status()
+        except requests.RequestException as e:
+            _report_error(
+                self.on_error,
+                url,
+                f"    ✗ Stažení selhalo (max. {self.max_retries} opakování) pro {url}: {e}",
+            )
+            return None
+        resp.encoding = "utf-8"
+        return resp
+
+
+# ---------------------------------------------------------------------------
+# Asynchronní HTTP klient (aiohttp) pro souběžné stahování
+# ---------------------------------------------------------------------------
+
+class AsyncHttpClient:
+    """
+    Asynchronní varianta HttpClient nad aiohttp.
+
+    Stahuje více URL souběžně (nejvýše `concurrency` požadavků najednou)
+    v jedné smyčce událostí. Pro 4 a více URL je výhodnější než sekvenční
+    HttpClient – čekání na síť se překrývá.
+
+    Použití:
+        async with AsyncHttpClient() as client:
+            pages = await client.get_many(urls)
+    """
+
+    def __init__(
+        self,
+        delay_range: tuple = (2.0, 5.0),
+        max_retries: int = 3,
+        concurrency: int = 10,
+        on_error: Optional[Callable[[str, str], None]] = None,
+    ):
+        if aiohttp is None:
+            raise ImportError(
+                "AsyncHttpClient vyžaduje balíček aiohttp (pip install aiohttp)."
+            )
+        self.delay_range = delay_range
+        self.max_retries = max_retries
+        self.concurrency = concurrency
+        self.on_error = on_error
+        self.session: Optional["aiohttp.ClientSession"] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncHttpClient":
+        self.session = aiohttp.ClientSession(
+            headers=HEADERS, timeout=aiohttp.ClientTimeout(total=30)
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.session.close()
+
+    async def get(self, url: str) -> Optional[str]:
+        """
+        Stáhne URL s retry logikou (exponenciální backoff jako HttpClient).
+
+        Před každým požadavkem se ve slotu semaforu čeká náhodné zpoždění
+        z delay_range.
+
+        Returns:
+            Text odpovědi (UTF-8) nebo None pokud všechny pokusy selhaly.
+        """
+        async with self._semaphore:
+            await asyncio.sleep(random.uniform(*self.delay_range))
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    await asyncio.sleep(2 ** (attempt - 1))
+                try:
+                    async with self.session.get(url) as resp:
+                        if (
+                            resp.status in RETRY_STATUSES
+                            and attempt < self.max_retries
+                        ):
+                            continue
+                        resp.raise_for_status()
+                        return await resp.text(encoding="utf-8")
+                except aiohttp.ClientResponseError as e:
+                    _report_error(
+                        self.on_error, url, f"    ✗ Stažení selhalo pro {url}: {e}"
+                    )
+                    return None
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if attempt == self.max_retries:
+                        _report_error(
+                            self.on_error,
+                            url,
+                            f"    ✗ Stažení selhalo (max. {self.max_retries} "
+                            f"opakování) pro {url}: {e}",
+                        )
+                        return None
         return None
+
+    async def get_many(self, urls: List[str]) -> List[Optional[str]]:
+        """Stáhne všechny URL souběžně; výsledky jsou ve stejném pořadí."""
+        return await asyncio.gather(*(self.get(url) for url in urls))
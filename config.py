@@ -1,3 +1,5 @@
+from dataclasses import dataclass
+
 BASE_URL = "https://www.vut.cz"
 PROGRAMS_URL_CS = "https://www.vut.cz/studenti/programy"
 PROGRAMS_URL_EN = "https://www.vut.cz/en/students/programmes"
@@ -12,57 +14,62 @@ PROGRAMS_BASE = f"{DATA_DIR}/programy_"
 PROGRAMS_CS = f"{PROGRAMS_BASE}cs.json"
 PROGRAMS_EN = f"{PROGRAMS_BASE}en.json"
 
-def get_programs_file(language=LANGUAGES[0]):
-    if language == LANGUAGES[0]:  # "cs-CZ"
-        return PROGRAMS_CS
-    elif language == LANGUAGES[1]:  # "en-US"
-        return PROGRAMS_EN
-    else:
-        raise ValueError("Neznámý jazyk. Použijte 'cs-CZ' nebo 'en-US'.")
-
 SUBJECTS_BASE = "subjects"
 SUBJECTS_DIR_CS = f"{DATA_DIR_CS}/{SUBJECTS_BASE}"
 SUBJECTS_DIR_EN = f"{DATA_DIR_EN}/{SUBJECTS_BASE}"
 
-def get_subjects_dir(language=LANGUAGES[0]):
-    if language == LANGUAGES[0]:  # "cs-CZ"
-        return SUBJECTS_DIR_CS
-    elif language == LANGUAGES[1]:  # "en-US"
-        return SUBJECTS_DIR_EN
-    else:
-        raise ValueError("Neznámý jazyk. Použijte 'cs-CZ' nebo 'en-US'.")
-
 STUDY_PLANS_DIR = f"{DATA_DIR}/raw_study_plans"
 STUDY_PLANS_OUTPUT_CS = f"{STUDY_PLANS_DIR}/plans_cs.json"
 STUDY_PLANS_OUTPUT_EN = f"{STUDY_PLANS_DIR}/plans_en.json"
 
-def get_study_plans_output(language=LANGUAGES[0]):
-    if language == LANGUAGES[0]:  # "cs-CZ"
-        return STUDY_PLANS_OUTPUT_CS
-    elif language == LANGUAGES[1]:  # "en-US"
-        return STUDY_PLANS_OUTPUT_EN
-    else:
-        raise ValueError("Neznámý jazyk. Použijte 'cs-CZ' nebo 'en-US'.")
-
 STUDY_PLANS_PROGRESS_CS = f"{STUDY_PLANS_DIR}/progress_cs.json"
 STUDY_PLANS_PROGRESS_EN = f"{STUDY_PLANS_DIR}/progress_en.json"
 
-def get_study_plans_progress(language=LANGUAGES[0]):
-    if language == LANGUAGES[0]:  # "cs-CZ"
-        return STUDY_PLANS_PROGRESS_CS
-    elif language == LANGUAGES[1]:  # "en-US"
-        return STUDY_PLANS_PROGRESS_EN
-    else:
-        raise ValueError("Neznámý jazyk. Použijte 'cs-CZ' nebo 'en-US'.")
+STUDY_PLANS_PROCESSED_CS = f"{STUDY_PLANS_DIR}/processed_cs.log"
+STUDY_PLANS_PROCESSED_EN = f"{STUDY_PLANS_DIR}/processed_en.log"
     
 STUDY_PROGRAMMES_BASE = "study_programmes"
 STUDY_PROGRAMMES_OUTPUT_CS = f"{DATA_DIR_CS}/{STUDY_PROGRAMMES_BASE}/programmes.json"
 STUDY_PROGRAMMES_OUTPUT_EN = f"{DATA_DIR_EN}/{STUDY_PROGRAMMES_BASE}/programmes.json"
 
-def get_study_programmes_output(language=LANGUAGES[0]):
-    if language == LANGUAGES[0]:  # "cs-CZ"
-        return STUDY_PROGRAMMES_OUTPUT_CS
-    elif language == LANGUAGES[1]:  # "en-US"
-        return STUDY_PROGRAMMES_OUTPUT_EN
-    else:
-        raise ValueError("Neznámý jazyk. Použijte 'cs-CZ' nebo 'en-US'.")
+# ---------------------------------------------------------------------------
+# Všechny cesty jedné jazykové verze pohromadě
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True, slots=True)
+class LangPaths:
+    """URL a cesty k datovým souborům pro jeden jazyk."""
+    programs_url: str
+    programs_file: str
+    subjects_dir: str
+    study_plans_output: str
+    study_plans_progress: str
+    study_plans_processed: str
+    study_programmes_output: str
+
+LANG_PATHS: dict[str, LangPaths] = {
+    LANGUAGES[0]: LangPaths(  # "cs-CZ"
+        programs_url=PROGRAMS_URL_CS,
+        programs_file=PROGRAMS_CS,
+        subjects_dir=SUBJECTS_DIR_CS,
+        study_plans_output=STUDY_PLANS_OUTPUT_CS,
+        study_plans_progress=STUDY_PLANS_PROGRESS_CS,
+        study_plans_processed=STUDY_PLANS_PROCESSED_CS,
+        study_programmes_output=STUDY_PROGRAMMES_OUTPUT_CS,
+    ),
+    LANGUAGES[1]: LangPaths(  # "en-US"
+        programs_url=PROGRAMS_URL_EN,
+        programs_file=PROGRAMS_EN,
+        subjects_dir=SUBJECTS_DIR_EN,
+        study_plans_output=STUDY_PLANS_OUTPUT_EN,
+        study_plans_progress=STUDY_PLANS_PROGRESS_EN,
+        study_plans_processed=STUDY_PLANS_PROCESSED_EN,
+        study_programmes_output=STUDY_PROGRAMMES_OUTPUT_EN,
+    ),
+}
+
+def get_lang_paths(language=LANGUAGES[0]) -> LangPaths:
+    try:
+        return LANG_PATHS[language]
+    except KeyError:
+        raise ValueError("Neznámý jazyk. Použijte 'cs-CZ' nebo 'en-US'.") from None
@@ -0,0 +1,31 @@
+"""
+Sdílené JSON pomocníky pro scraper i DataAnalyst.
+
+Pokud je nainstalovaný orjson, serializace i parsování jdou přes něj,
+jinak se použije standardní modul json se stejným výstupem.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson není povinný – fallback na standardní json
+    orjson = None
+
+
+def loads_json(raw: bytes):
+    """Naparsuje JSON z UTF-8 bajtů."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def dumps_json(data, pretty: bool = False) -> bytes:
+    """Serializuje data do UTF-8 JSON – kompaktně, nebo odsazené o 2 mezery."""
+    if orjson is not None:
+        if pretty:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        return orjson.dumps(data)
+    if pretty:
+        return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
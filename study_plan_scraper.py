@@ -15,15 +15,97 @@ Výstup: JSON se strukturou:
 }]
 """
 
+import asyncio
+import itertools
 import json
 import os
 import re
 from collections import deque
-from bs4 import BeautifulSoup
-from typing import List, Dict, Optional, Deque
+from concurrent.futures import ThreadPoolExecutor
+from bs4 import BeautifulSoup, SoupStrainer
+from typing import List, Dict, Optional, Deque, Tuple
 
 from config import *
-from HttpClient import HttpClient
+from HttpClient import AsyncHttpClient, HttpClient
+from json_utils import dumps_json, loads_json
+
+try:
+    import lxml  # noqa: F401 – C parser pro BeautifulSoup (výrazně rychlejší)
+    _HTML_PARSER = "lxml"
+except ImportError:  # lxml není povinný – fallback na čistě Python parser
+    _HTML_PARSER = "html.parser"
+
+# ---------------------------------------------------------------------------
+# Předkompilované regulární výrazy (volané pro každý program / tabulku / řádek)
+# ---------------------------------------------------------------------------
+
+# "Název programu (ZKRATKA)"
+_RE_PROGRAM_INFO = re.compile(r"^(.*?)\s*\(([^)]+)\)$")
+
+# Doba studia: "X roky/rok" nebo "X years/year"
+_RE_DURATION = re.compile(r"(\d+)\s*(rok[ůy]?|years?)", re.IGNORECASE)
+# Totéž, ale ne "X. ročník" (fallback při hledání v celém elementu)
+_RE_DURATION_STANDALONE = re.compile(
+    r"(\d+)\s*(rok[ůy]?|years?)(?!\s*[,.]?\s*ročník)", re.IGNORECASE
+)
+
+# Kredity v různých formátech – jedna alternace, od nejkonkrétnější varianty:
+# "120 ECTS kreditů", "120 ECTS credits", "120 ECTS", "120 credits", "120 kreditů"
+# (?<!\d): číslo se zkouší jen od začátku – ne znovu od každé jeho číslice
+_RE_CREDITS = re.compile(
+    r"(?<!\d)(\d+)\s*(?:ECTS\s*kredit[ůy]?|ECTS\s*credits?|ECTS|credits?|kredit[ůy]?)",
+    re.IGNORECASE,
+)
+
+# Caption tabulky – ročník
+_RE_YEAR_CS = re.compile(r"(\d+)\.\s*ročník", re.IGNORECASE)
+_RE_YEAR_EN = re.compile(r"(\d+)(?:\.|st|nd|rd|th)\s+year", re.IGNORECASE)
+_RE_ANY_YEAR_CS = re.compile(r"libovoln", re.IGNORECASE)
+_RE_ANY_YEAR_EN = re.compile(r"any\s+year", re.IGNORECASE)
+
+# Caption tabulky – semestr (pořadí odpovídá prioritě)
+_SEMESTER_PATTERNS = (
+    (re.compile(r"zimn", re.IGNORECASE), "zimní"),
+    (re.compile(r"letn", re.IGNORECASE), "letní"),
+    (re.compile(r"winter", re.IGNORECASE), "zimní"),
+    (re.compile(r"summer", re.IGNORECASE), "letní"),
+)
+
+# Nadpis rozcestníku specializací
+_RE_SPEC_H3 = re.compile(
+    r"Specializace|Specialisations?|Specializations?", re.IGNORECASE
+)
+
+# Předfiltr nad surovým HTML (viz _may_be_plan). Podřetězce se hledají
+# v obvyklých variantách velikosti písmen – bez kopie dokumentu přes lower().
+_HINT_TABLE = ("<table", "<TABLE")
+# Studijní plán podle popisku tabulky („1. ročník, zimní semestr")
+_HINT_CAPTION = ("<caption", "<CAPTION")
+# Rozcestník: nadpis <h3> „Specializace" / „Specialization"
+_HINT_H3 = ("<h3", "<H3")
+_HINT_SPEC = ("speciali", "Speciali", "SPECIALI")
+# Fallback: hlavička tabulky se sloupcem zkratky
+_HINT_TH = ("<th", "<TH")
+_HINT_ABBR = ("zkr", "Zkr", "ZKR", "abbr", "Abbr", "ABBR")
+
+# Z hlavního indexu programů se používají jen položky fakult – zbytek
+# stránky (hlavička, menu, patička) se vůbec nestaví do stromu.
+_INDEX_STRAINER = SoupStrainer(class_="c-faculties-list__item")
+
+# Hlavičky sloupců tabulky předmětů (malými písmeny, bez koncové tečky)
+# → klíč ve výsledném předmětu
+_HEADER_ALIASES: Dict[str, str] = {
+    **dict.fromkeys(("zkratka", "zkr", "abbr", "abbreviation"), "zkratka"),
+    **dict.fromkeys(("název", "nazev", "name", "název (zaměření)", "title"), "nazev"),
+    **dict.fromkeys(("kr", "cr", "kredity", "credits", "cred"), "kredity"),
+    **dict.fromkeys(
+        ("pov", "com", "povinnost", "povinný", "obligation", "type"), "povinnost"
+    ),
+    **dict.fromkeys(
+        ("uk", "compl", "ukončení", "zakončení", "completion", "exam"), "zakonceni"
+    ),
+    **dict.fromkeys(("sk", "gr", "skupina", "group"), "skupina"),
+}
 
 
 # ---------------------------------------------------------------------------
@@ -40,47 +122,120 @@ class StudyPlanScraper:
     """
 
     MAX_RETRIES = 3
+    # Průběžný stav se ukládá po zpracování tolika URL (ne po každé)
+    PROGRESS_EVERY = 25
 
     def __init__(
         self,
         language: str = "cs-CZ",
         delay_range: tuple = (2.0, 5.0),
         output_dir: Optional[str] = None,
+        concurrency: int = 1,
     ):
         self.language = language
+        self.delay_range = delay_range
+        self.concurrency = max(1, concurrency)
         self.base_url = BASE_URL
-        self.programs_url = PROGRAMS_URL_CS if language == "cs-CZ" else PROGRAMS_URL_EN
+        paths = get_lang_paths(language)
+        self.programs_url = paths.programs_url
 
         # Cesty k souborům
-        self.output_file = get_study_plans_output(language)
-        self.progress_file = get_study_plans_progress(language)
+        self.output_file = paths.study_plans_output
+        self.progress_file = paths.study_plans_progress
+        self.processed_file = paths.study_plans_processed
         
         # Vytvoř adresář pro výstupní soubory
         os.makedirs(os.path.dirname(self.output_file), exist_ok=True)
         
         # HTTP klient
         self.client = HttpClient(
-            delay_range=delay_range, max_retries=self.MAX_RETRIES
+            delay_range=delay_range,
+            max_retries=self.MAX_RETRIES,
+            on_error=self._on_fetch_error,
         )
 
         # Stav
         self.queue: Deque[Dict] = deque()
         self.processed_urls: set = set()
+        # Plná URL všech položek, které kdy byly zařazeny do fronty
+        self.queued_urls: set = set()
         self.results: List[Dict] = []
+        # Zpracované URL od posledního uložení stavu (k připsání do logu)
+        self._new_processed: List[str] = []
+        # Platná délka logu zpracovaných URL v bajtech (uložena v progress)
+        self._processed_size = 0
+        # Položky vybrané z fronty, které ještě nebyly zpracovány
+        # (aktuální i předem stahovaná dávka) – v pořadí z fronty
+        self._pending: List[tuple] = []
+
+        # Asynchronní klient pro dávky (otevře se při první dávce a sdílí
+        # ho celá fáze 2 – spojení zůstávají otevřená mezi dávkami)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_client: Optional[AsyncHttpClient] = None
+        # Chybové hlášky právě stahované dávky podle URL (None = vypsat hned).
+        # Dávka se stahuje během výpisu předchozí – hlášky se vypíšou až
+        # u položky, ke které patří.
+        self._fetch_errors: Optional[Dict[str, List[str]]] = None
 
     # ------------------------------------------------------------------
     # Persistence – ukládání / načítání stavu
     # ------------------------------------------------------------------
 
+    def _enqueue(self, item: Dict) -> bool:
+        """
+        Zařadí položku do fronty, pokud její URL ještě nebyla zařazena.
+
+        Plná URL se uloží do položky (`full_url`) – dál se už nesestavuje.
+        """
+        full_url = self._full_url(item["url"])
+        if full_url in self.queued_urls or full_url in self.processed_urls:
+            return False
+        item["full_url"] = full_url
+        self.queued_urls.add(full_url)
+        self.queue.append(item)
+        return True
+
+    def _mark_processed(self, full_url: str) -> None:
+        """Označí URL jako zpracovanou (do logu se zapíše při uložení stavu)."""
+        self.processed_urls.add(full_url)
+        self._new_processed.append(full_url)
+
     def _save_progress(self) -> None:
-        """Uloží aktuální stav (fronta, zpracované URL, výsledky)."""
+        """
+        Uloží aktuální stav (fronta, zpracované URL, výsledky).
+
+        Zpracované URL se pouze připisují na konec logu (jedna na řádek),
+        takže se při každém uložení nepřepisuje celá množina. Progress soubor
+        si pamatuje platnou délku logu – případný řádek připsaný těsně před
+        pádem se při načtení zahodí.
+
+        Soubor čte jen resume, proto je bez odsazení. Zapisuje se atomicky
+        (dočasný soubor + os.replace), přerušení zápisu tak nepoškodí
+        předchozí uložený stav.
+        """
+        if self._new_processed or not self._processed_size:
+            # Nový běh (délka 0) začíná s prázdným logem
+            with open(self.processed_file, "ab" if self._processed_size else "wb") as f:
+                f.write("".join(f"{url}\n" for url in self._new_processed).encode("utf-8"))
+                self._processed_size = f.tell()
+            self._new_processed.clear()
+
+        # Vybrané, ale nezpracované položky patří na začátek fronty –
+        # jinak by je pád po uložení stavu ztratil
+        queue = [
+            item for item, full_url in self._pending
+            if full_url not in self.processed_urls
+        ]
+        queue.extend(self.queue)
         state = {
-            "processed_urls": list(self.processed_urls),
-            "queue": list(self.queue),
+            "processed_size": self._processed_size,
+            "queue": queue,
             "results": self.results,
         }
-        with open(self.progress_file, "w", encoding="utf-8") as f:
-            json.dump(state, f, ensure_ascii=False, indent=2)
+        tmp_file = f"{self.progress_file}.tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(dumps_json(state))
+        os.replace(tmp_file, self.progress_file)
 
     def _load_progress(self) -> bool:
         """
@@ -92,24 +247,38 @@ class StudyPlanScraper:
         if not os.path.exists(self.progress_file):
             return False
         try:
-            with open(self.progress_file, "r", encoding="utf-8") as f:
-                state = json.load(f)
-            self.processed_urls = set(state.get("processed_urls", []))
+            with open(self.progress_file, "rb") as f:
+                raw = f.read()
+            state = loads_json(raw)
+            self._processed_size = state.get("processed_size", 0)
+            self.processed_urls = set()
+            if self._processed_size:
+                with open(self.processed_file, "r+b") as f:
+                    f.truncate(self._processed_size)
+                    self.processed_urls.update(f.read().decode("utf-8").splitlines())
+            # Starší formát ukládal zpracované URL přímo v progress souboru –
+            # převezmou se a při příštím uložení se zapíšou do nového logu
+            legacy_urls = state.get("processed_urls", [])
+            self.processed_urls.update(legacy_urls)
+            self._new_processed = list(legacy_urls)
             self.queue = deque(state.get("queue", []))
+            # Množina zařazených URL se neukládá – odvodí se z fronty
+            self.queued_urls = {self._item_url(q) for q in self.queue}
+            self.queued_urls |= self.processed_urls
             self.results = state.get("results", [])
             print(
                 f"✓ Načten uložený stav: {len(self.processed_urls)} zpracováno, "
                 f"{len(self.queue)} ve frontě, {len(self.results)} výsledků"
             )
             return True
-        except (json.JSONDecodeError, KeyError) as e:
+        except (json.JSONDecodeError, KeyError, OSError) as e:
             print(f"✗ Nelze načíst progress soubor: {e}")
             return False
 
     def _save_results(self) -> None:
         """Uloží finální výsledky do JSON."""
-        with open(self.output_file, "w", encoding="utf-8") as f:
-            json.dump(self.results, f, ensure_ascii=False, indent=2)
+        with open(self.output_file, "wb") as f:
+            f.write(dumps_json(self.results, pretty=True))
         print(f"\n✓ Výsledky uloženy do {self.output_file}")
 
     # ------------------------------------------------------------------
@@ -120,15 +289,21 @@ class StudyPlanScraper:
     def _clean_text(text: Optional[str]) -> str:
         """Vyčistí text od nadbytečných mezer."""
         if text:
+            # split()/join běží celé v C – na krátkých buňkách tabulek je
+            # 3–4× rychlejší než re.sub(r"\s+", " ", text).strip()
             return " ".join(text.split())
         return ""
 
     def _full_url(self, path: str) -> str:
         """Sestaví plné URL z relativní cesty."""
-        if path.startswith("http"):
+        if path.startswith(("http://", "https://")):
             return path
         return f"{self.base_url}{path}"
 
+    def _item_url(self, item: Dict) -> str:
+        """Plná URL položky fronty (starší progress soubory ji nemají uloženou)."""
+        return item.get("full_url") or self._full_url(item["url"])
+
     @staticmethod
     def _parse_program_info(full_text: str):
         """
@@ -138,11 +313,26 @@ class StudyPlanScraper:
             "Informační technologie (BIT)" -> ("Informační technologie", "BIT")
         """
         full_text = " ".join(full_text.split())
-        match = re.match(r"^(.*?)\s*\(([^)]+)\)$", full_text)
+        match = _RE_PROGRAM_INFO.match(full_text)
         if match:
             return match.group(1).strip(), match.group(2).strip()
         return full_text, None
 
+    @staticmethod
+    def _header_cells(table) -> list:
+        """
+        Buňky <th> z hlavičky tabulky – ekvivalent table.select("thead th").
+
+        Nativní find_all() obchází kompilaci a vyhodnocení CSS selektoru
+        (soupsieve), které se jinak opakuje pro každou tabulku na stránce.
+        """
+        return [th for thead in table.find_all("thead") for th in thead.find_all("th")]
+
+    @staticmethod
+    def _body_rows(table) -> list:
+        """Řádky těla tabulky – ekvivalent table.select("tbody tr")."""
+        return [tr for tbody in table.find_all("tbody") for tr in tbody.find_all("tr")]
+
     def _normalize_specialization(self, spec: str) -> str:
         """
         Normalizuje specializaci podle pravidla:
@@ -179,24 +369,26 @@ class StudyPlanScraper:
             return ""
         
         # Hledání v meta informacích (např. .b-branch__meta-title, .b-programme__meta)
-        meta_selectors = [
-            ".b-branch__meta-title",
-            ".b-programme__meta",
-            ".b-meta",
+        # Nativní find(class_=...) – bez soupsieve, volá se pro každý
+        # program v indexu i každý řádek rozcestníku specializací
+        meta_classes = [
+            "b-branch__meta-title",
+            "b-programme__meta",
+            "b-meta",
         ]
         
-        for selector in meta_selectors:
-            meta_elem = element.select_one(selector)
+        for meta_class in meta_classes:
+            meta_elem = element.find(class_=meta_class)
             if meta_elem:
                 text = meta_elem.get_text().strip()
                 # Hledání patternu "X roky/rok" nebo "X years/year"
-                match = re.search(r'(\d+)\s*(rok[ůy]?|years?)', text, re.IGNORECASE)
+                match = _RE_DURATION.search(text)
                 if match:
                     return text
         
         # Hledání v celém textu elementu jako fallback
         text = element.get_text()
-        match = re.search(r'(\d+)\s*(rok[ůy]?|years?)(?!\s*[,.]?\s*ročník)', text, re.IGNORECASE)
+        match = _RE_DURATION_STANDALONE.search(text)
         if match:
             return match.group(0)
         
@@ -257,21 +449,10 @@ class StudyPlanScraper:
             return ""
         
         text = soup.get_text()
-        credits_values = []
-        
-        # Hledání všech výskytů kreditů v různých formátech
-        patterns = [
-            r'(\d+)\s*ECTS\s*kredit[ůy]?',  # "120 ECTS kreditů"
-            r'(\d+)\s*ECTS\s*credits?',       # "120 ECTS credits"
-            r'(\d+)\s*ECTS',                  # "120 ECTS"
-            r'(\d+)\s*credits?',              # "120 credits"
-            r'(\d+)\s*kredit[ůy]?',           # "120 kreditů"
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            credits_values.extend([int(m) for m in matches])
-        
+
+        # Všechny výskyty kreditů v různých formátech – jediný průchod textem
+        credits_values = [int(m.group(1)) for m in _RE_CREDITS.finditer(text)]
+
         # Vrátí maximální hodnotu nebo prázdný řetězec
         if credits_values:
             return str(max(credits_values))
@@ -294,31 +475,25 @@ class StudyPlanScraper:
         result = {"rocnik": "", "semestr": ""}
 
         # Ročník: číslo nebo „libovolný"
-        m_year = re.search(r"(\d+)\.\s*ročník", caption_text, re.IGNORECASE)
+        m_year = _RE_YEAR_CS.search(caption_text)
         if m_year:
             result["rocnik"] = m_year.group(1)
-        elif re.search(r"libovoln", caption_text, re.IGNORECASE):
+        elif _RE_ANY_YEAR_CS.search(caption_text):
             result["rocnik"] = "libovolný"
         # Anglické varianty
-        elif re.search(r"any\s+year", caption_text, re.IGNORECASE):
+        elif _RE_ANY_YEAR_EN.search(caption_text):
             result["rocnik"] = "libovolný"
         else:
             # "1. year of study" nebo "1st year"
-            m_year_en = re.search(
-                r"(\d+)(?:\.|st|nd|rd|th)\s+year", caption_text, re.IGNORECASE
-            )
+            m_year_en = _RE_YEAR_EN.search(caption_text)
             if m_year_en:
                 result["rocnik"] = m_year_en.group(1)
 
         # Semestr
-        if re.search(r"zimn", caption_text, re.IGNORECASE):
-            result["semestr"] = "zimní"
-        elif re.search(r"letn", caption_text, re.IGNORECASE):
-            result["semestr"] = "letní"
-        elif re.search(r"winter", caption_text, re.IGNORECASE):
-            result["semestr"] = "zimní"
-        elif re.search(r"summer", caption_text, re.IGNORECASE):
-            result["semestr"] = "letní"
+        for pattern, semestr in _SEMESTER_PATTERNS:
+            if pattern.search(caption_text):
+                result["semestr"] = semestr
+                break
 
         return result
 
@@ -337,19 +512,38 @@ class StudyPlanScraper:
         print("FÁZE 1: Discovery – sestavení fronty URL")
         print("=" * 70)
 
-        resp = self.client.get(self.programs_url, delay=False)
+        resp = self.client.get(self.programs_url)
         if not resp:
             raise ConnectionError(
                 f"Nelze stáhnout hlavní stránku: {self.programs_url}"
             )
 
-        soup = BeautifulSoup(resp.text, "html.parser")
-        faculty_items = soup.select(".c-faculties-list__item")
+        # Parseru se předávají přímo bajty odpovědi – dekóduje je sám (v C)
+        # a odpadá kopie celé stránky přes resp.text
+        soup = BeautifulSoup(
+            resp.content, _HTML_PARSER,
+            parse_only=_INDEX_STRAINER, from_encoding="utf-8",
+        )
+        # Strom obsahuje jen položky fakult (viz _INDEX_STRAINER) – stačí
+        # find_all bez překladu CSS selektoru
+        faculty_items = soup.find_all(class_="c-faculties-list__item")
         print(f"Nalezeno fakult: {len(faculty_items)}")
 
         for item in faculty_items:
-            fac_abbr_elem = item.select_one(".b-faculty-list__faculty")
-            fac_title_elem = item.select_one(".b-faculty-list__title")
+            # Jeden průchod podstromem fakulty místo samostatného CSS dotazu
+            # pro zkratku, název a programy
+            fac_abbr_elem = fac_title_elem = None
+            program_nodes = []
+            for el in item.find_all(True):
+                classes = el.get("class")
+                if not classes:
+                    continue
+                if "b-programme" in classes:
+                    program_nodes.append(el)
+                elif fac_abbr_elem is None and "b-faculty-list__faculty" in classes:
+                    fac_abbr_elem = el
+                elif fac_title_elem is None and "b-faculty-list__title" in classes:
+                    fac_title_elem = el
             if not fac_abbr_elem or not fac_title_elem:
                 continue
 
@@ -357,10 +551,10 @@ class StudyPlanScraper:
             faculty_abbr = self._clean_text(fac_abbr_elem.get_text())
             print(f"\n  {faculty_abbr} – {faculty_name}")
 
-            program_nodes = item.select(".b-programme")
             for prog in program_nodes:
-                link_elem = prog.select_one(
-                    ".b-programme__title .b-programme__link"
+                title_elem = prog.find(class_="b-programme__title")
+                link_elem = (
+                    title_elem.find(class_="b-programme__link") if title_elem else None
                 )
                 if not link_elem:
                     continue
@@ -389,7 +583,8 @@ class StudyPlanScraper:
                     "typ": "program",
                     "retries": 0,
                 }
-                self.queue.append(queue_item)
+                if not self._enqueue(queue_item):
+                    continue
                 duration_info = f" ({duration})" if duration else ""
                 print(f"    + {abbr}: {name}{duration_info}")
 
@@ -403,45 +598,72 @@ class StudyPlanScraper:
     # ------------------------------------------------------------------
 
     @staticmethod
-    def _detect_page_type(soup: BeautifulSoup) -> str:
+    def _may_be_plan(html: str) -> bool:
+        """
+        Levný test nad surovým HTML, zda stránka může být rozcestníkem
+        nebo studijním plánem. Kontroluje jen nutné podmínky
+        _detect_page_type: tabulku a k ní popisek, nadpis specializací
+        nebo hlavičku se zkratkou. Běžná stránka webu s tabulkou (např.
+        kontakty nebo termíny) se tak vůbec neparsuje.
+        """
+        def has(hints):
+            return any(hint in html for hint in hints)
+
+        if not has(_HINT_TABLE):
+            return False
+        return (
+            has(_HINT_CAPTION)
+            or (has(_HINT_H3) and has(_HINT_SPEC))
+            or (has(_HINT_TH) and has(_HINT_ABBR))
+        )
+
+    @staticmethod
+    def _detect_page_type(soup: BeautifulSoup) -> Tuple[str, list]:
         """
         Detekuje typ stránky.
 
         Returns:
+            Dvojice (typ, tabulky), kde typ je:
             'specializations' – stránka se seznamem specializací
             'study_plan'      – stránka se studijním plánem
             'unknown'         – nelze rozpoznat
+            a tabulky jsou všechny <table> stránky (pro rozcestník prázdný
+            seznam) – extrakce předmětů je tak nemusí hledat znovu.
         """
-        # Detekce specializací
-        h3_spec = soup.find(
-            "h3",
-            string=re.compile(
-                r"Specializace|Specialisations?|Specializations?", re.IGNORECASE
-            ),
-        )
-        if h3_spec:
-            table = soup.select_one("table.data")
-            if table:
-                return "specializations"
+        # Detekce specializací – přímý průchod <h3> je rychlejší než obecný
+        # filtr find(..., string=...); testuje se stejně jen h3.string
+        for h3 in soup.find_all("h3"):
+            text = h3.string
+            if text and _RE_SPEC_H3.search(text):
+                if soup.select_one("table.data"):
+                    return "specializations", []
+                break
+
+        # Tabulky i jejich popisky jedním průchodem stromu – per-tabulkové
+        # table.find("caption") prochází celý podstrom tabulek bez popisku.
+        elements = soup.find_all(("table", "caption"))
+        tables = [el for el in elements if el.name == "table"]
 
         # Detekce studijního plánu – tabulka s caption „X. ročník, …"
-        for table in soup.select("table"):
-            caption = table.select_one("caption")
-            if caption:
-                cap_text = caption.get_text().lower()
-                if "ročník" in cap_text or "semestr" in cap_text or "year" in cap_text:
-                    return "study_plan"
-            # Fallback: headers s Zkratka + Kr.
+        for caption in elements:
+            if caption.name != "caption":
+                continue
+            cap_text = caption.get_text().lower()
+            if "ročník" in cap_text or "semestr" in cap_text or "year" in cap_text:
+                return "study_plan", tables
+
+        # Fallback: headers s Zkratka + Kr.
+        for table in tables:
             headers = [
-                th.get_text().strip().lower() for th in table.select("thead th")
+                th.get_text().strip().lower() for th in StudyPlanScraper._header_cells(table)
             ]
             header_joined = " ".join(headers)
             has_abbr = "zkr" in header_joined or "abbr" in header_joined
             has_credits = "kr" in header_joined or "cr" in header_joined
             if has_abbr and has_credits:
-                return "study_plan"
+                return "study_plan", tables
 
-        return "unknown"
+        return "unknown", tables
 
     def _extract_specializations(
         self, soup: BeautifulSoup, parent_item: Dict
@@ -454,8 +676,7 @@ class StudyPlanScraper:
         if not table:
             return new_items
 
-        rows = table.select("tbody tr")
-        for row in rows:
+        for row in self._body_rows(table):
             cells = row.find_all("td")
             if len(cells) < 2:
                 continue
@@ -505,12 +726,13 @@ class StudyPlanScraper:
 
         return new_items
 
-    def _extract_subjects_with_semesters(
-        self, soup: BeautifulSoup
-    ) -> List[Dict]:
+    def _extract_subjects_with_semesters(self, tables: list) -> List[Dict]:
         """
         Extrahuje předměty ze VŠECH per-semestrových tabulek na stránce.
 
+        Args:
+            tables: Všechny <table> elementy stránky (z _detect_page_type).
+
         Používá <caption> element k určení ročníku a semestru.
         Předměty, které se vyskytují ve více semestrech, jsou sloučeny:
         - semestr se nastaví na seznam unikátních hodnot
@@ -521,9 +743,9 @@ class StudyPlanScraper:
         """
         raw_subjects: List[Dict] = []
 
-        for table in soup.select("table"):
+        for table in tables:
             # Musí mít <caption> s informací o ročníku/semestru
-            caption = table.select_one("caption")
+            caption = table.find("caption")
             if not caption:
                 continue
 
@@ -540,7 +762,7 @@ class StudyPlanScraper:
             # Ověříme hlavičky
             headers_raw = [
                 self._clean_text(th.get_text()).lower()
-                for th in table.select("thead th")
+                for th in self._header_cells(table)
             ]
             if not headers_raw:
                 continue
@@ -552,7 +774,7 @@ class StudyPlanScraper:
             col_map = self._map_columns(headers_raw)
 
             # Parsování řádků
-            for row in table.select("tbody tr"):
+            for row in self._body_rows(table):
                 cells = row.find_all("td")
                 if not cells or len(cells) < 3:
                     continue
@@ -577,34 +799,28 @@ class StudyPlanScraper:
         """
         col_map: Dict[str, int] = {}
         for idx, h in enumerate(headers):
-            hl = h.strip().rstrip(".")
-            if hl in ("zkratka", "zkr", "abbr", "abbreviation"):
-                col_map.setdefault("zkratka", idx)
-            elif hl in ("název", "nazev", "name", "název (zaměření)", "title"):
-                col_map.setdefault("nazev", idx)
-            elif hl in ("kr", "cr", "kredity", "credits", "cred"):
-                col_map.setdefault("kredity", idx)
-            elif hl in ("pov", "com", "povinnost", "povinný", "obligation", "type"):
-                col_map.setdefault("povinnost", idx)
-            elif hl in ("uk", "compl", "ukončení", "zakončení", "completion", "exam"):
-                col_map.setdefault("zakonceni", idx)
-            elif hl in ("sk", "gr", "skupina", "group"):
-                col_map.setdefault("skupina", idx)
+            key = _HEADER_ALIASES.get(h.strip().rstrip("."))
+            if key:
+                col_map.setdefault(key, idx)
         return col_map
 
     def _parse_subject_row(
         self, cells: list, col_map: Dict[str, int]
     ) -> Optional[Dict]:
         """Parsuje jeden řádek tabulky předmětů."""
+        # Text každé namapované buňky se získá právě jednou (get_text() prochází
+        # celý podstrom buňky); nenamapované sloupce se vůbec nečtou.
+        n_cells = len(cells)
+        clean = self._clean_text
+        texts = {
+            key: clean(cells[idx].get_text())
+            for key, idx in col_map.items()
+            if idx < n_cells
+        }
+        text = texts.get
 
-        def _cell_text(key: str) -> str:
-            idx = col_map.get(key)
-            if idx is not None and idx < len(cells):
-                return self._clean_text(cells[idx].get_text())
-            return ""
-
-        zkratka = _cell_text("zkratka")
-        nazev = _cell_text("nazev")
+        zkratka = text("zkratka", "")
+        nazev = text("nazev", "")
 
         if not zkratka and not nazev:
             return None
@@ -613,21 +829,21 @@ class StudyPlanScraper:
         url = ""
         for key in ("nazev", "zkratka"):
             idx = col_map.get(key)
-            if idx is not None and idx < len(cells):
+            if idx is not None and idx < n_cells:
                 link = cells[idx].find("a")
                 if link and link.get("href"):
                     url = self._full_url(link["href"])
                     if not nazev:
-                        nazev = self._clean_text(link.get_text())
+                        nazev = clean(link.get_text())
                     break
 
         return {
             "zkratka": zkratka,
             "nazev": nazev,
-            "kredity": _cell_text("kredity"),
-            "povinnost": _cell_text("povinnost"),
-            "zakonceni": _cell_text("zakonceni"),
-            "skupina": _cell_text("skupina"),
+            "kredity": text("kredity", ""),
+            "povinnost": text("povinnost", ""),
+            "zakonceni": text("zakonceni", ""),
+            "skupina": text("skupina", ""),
             "url": url,
         }
 
@@ -639,29 +855,38 @@ class StudyPlanScraper:
         - semestr → seznam unikátních hodnot (["zimní"] nebo ["zimní", "letní"])
         - rocnik  → minimální numerický ročník; „libovolný" má nejnižší prioritu
         """
-        merged: Dict[str, Dict] = {}
+        merged: Dict = {}
+        # Semestry každého předmětu i jako množina – test duplicity v O(1)
+        semesters: Dict[str, set] = {}
+        no_key = itertools.count()
 
         for subj in raw:
             key = subj["zkratka"]
+            semestr = subj["semestr"]
             if not key:
-                merged[f"_no_key_{id(subj)}"] = {
+                # Předměty bez zkratky se neslučují (celočíselný klíč
+                # nekoliduje se zkratkami)
+                merged[next(no_key)] = {
                     **subj,
-                    "semestr": [subj["semestr"]] if subj["semestr"] else [],
+                    "semestr": [semestr] if semestr else [],
                     "rocnik": subj["rocnik"],
                 }
                 continue
 
-            if key not in merged:
+            existing = merged.get(key)
+            if existing is None:
                 merged[key] = {
                     **subj,
-                    "semestr": [subj["semestr"]] if subj["semestr"] else [],
+                    "semestr": [semestr] if semestr else [],
                     "rocnik": subj["rocnik"],
                 }
+                semesters[key] = {semestr}
             else:
-                existing = merged[key]
                 # Sloučení semestru
-                if subj["semestr"] and subj["semestr"] not in existing["semestr"]:
-                    existing["semestr"].append(subj["semestr"])
+                seen = semesters[key]
+                if semestr and semestr not in seen:
+                    seen.add(semestr)
+                    existing["semestr"].append(semestr)
                 # Sloučení ročníku: numerický min, libovolný pouze pokud nic jiného
                 existing["rocnik"] = _min_rocnik(
                     existing["rocnik"], subj["rocnik"]
@@ -676,7 +901,13 @@ class StudyPlanScraper:
     def phase2_extract(self) -> None:
         """
         Fáze 2: Prochází frontu URL, stahuje studijní plány a extrahuje
-        tabulky předmětů. Ukládá průběžný stav po každé položce.
+        tabulky předmětů.
+
+        Z fronty se bere vždy až `concurrency` položek, které se stáhnou
+        souběžně; parsování pak probíhá postupně v hlavním vlákně. Další
+        dávka se přitom už stahuje na pozadí, takže čas parsování se
+        schová do čekání na síť. Průběžný stav se ukládá po každých
+        PROGRESS_EVERY zpracovaných URL a při přerušení (např. Ctrl+C).
         """
         print("\n" + "=" * 70)
         print("FÁZE 2: Extraction – stahování studijních plánů")
@@ -685,64 +916,212 @@ class StudyPlanScraper:
         total_initial = len(self.queue) + len(self.processed_urls)
         counter = len(self.processed_urls)
 
-        while self.queue:
-            item = self.queue.popleft()
-            url = item["url"]
-            full_url = self._full_url(url)
+        try:
+            self._extract_loop(total_initial, counter)
+        except BaseException:
+            # Nezpracované položky vrátit na začátek fronty
+            for item, full_url in reversed(self._pending):
+                if full_url not in self.processed_urls:
+                    self.queue.appendleft(item)
+            self._pending.clear()
+            self._save_progress()
+            raise
+        finally:
+            self._close_async_client()
 
-            if full_url in self.processed_urls:
-                continue
+        print(
+            f"\n✓ Fáze 2 dokončena. "
+            f"Celkem {len(self.results)} studijních plánů."
+        )
 
-            counter += 1
-            remaining = len(self.queue)
-            label = (
-                f"{item['zkratka_fakulty']} → "
-                f"{item['zkratka_programu']}: {item['nazev_programu']}"
-            )
-            if item.get("specializace"):
-                label += f" → {item['specializace']}"
-
-            print(f"\n[{counter}/{total_initial + remaining}] {label}")
-            print(f"    URL: {full_url}")
-
-            # Random delay
-            self.client.delay()
-
-            resp = self.client.get(full_url)
-            if not resp:
-                retries = item.get("retries", 0)
-                if retries < self.MAX_RETRIES:
-                    item["retries"] = retries + 1
-                    self.queue.append(item)
-                    print(
-                        f"    ↻ Zařazeno zpět do fronty "
-                        f"(pokus {retries + 1}/{self.MAX_RETRIES})"
+    def _extract_loop(self, total_initial: int, counter: int) -> None:
+        """
+        Hlavní smyčka fáze 2.
+
+        Stahování běží v jednom vlákně na pozadí (producent), parsování
+        a veškeré změny stavu v hlavním vlákně (konzument). `_pending` se
+        průběžně plní vybranými a vyprazdňuje zpracovanými položkami.
+        """
+        with ThreadPoolExecutor(max_workers=1) as fetcher:
+
+            def prefetch():
+                batch = self._next_batch()
+                self._pending.extend(batch)
+                if not batch:
+                    return batch, None
+                urls = [full_url for _, full_url in batch]
+                return batch, fetcher.submit(self._fetch_batch, urls)
+
+            batch, future = prefetch()
+            while future is not None:
+                pages, errors = future.result()
+                # Další dávka se stahuje, zatímco se parsuje tato
+                next_batch, future = prefetch()
+
+                for idx, ((item, full_url), html) in enumerate(zip(batch, pages)):
+                    counter += 1
+                    # Zbytek fronty + stahovaná dávka + dosud nevypsané
+                    # položky aktuální dávky
+                    remaining = (
+                        len(self.queue) + len(next_batch) + len(batch) - idx - 1
                     )
-                else:
-                    print(
-                        f"    ✗ Přeskočeno po {self.MAX_RETRIES} "
-                        f"neúspěšných pokusech"
+                    label = (
+                        f"{item['zkratka_fakulty']} → "
+                        f"{item['zkratka_programu']}: {item['nazev_programu']}"
                     )
-                    self.processed_urls.add(full_url)
+                    if item.get("specializace"):
+                        label += f" → {item['specializace']}"
+
+                    print(f"\n[{counter}/{total_initial + remaining}] {label}")
+                    print(f"    URL: {full_url}")
+                    for message in errors.get(full_url, ()):
+                        print(message)
+
+                    if html is None:
+                        retries = item.get("retries", 0)
+                        if retries < self.MAX_RETRIES:
+                            item["retries"] = retries + 1
+                            self.queue.append(item)
+                            print(
+                                f"    ↻ Zařazeno zpět do fronty "
+                                f"(pokus {retries + 1}/{self.MAX_RETRIES})"
+                            )
+                        else:
+                            print(
+                                f"    ✗ Přeskočeno po {self.MAX_RETRIES} "
+                                f"neúspěšných pokusech"
+                            )
+                            self._mark_processed(full_url)
+                    else:
+                        self._process_page(item, full_url, html)
+                        self._mark_processed(full_url)
+                    self._pending.pop(0)
+
+                # Po poslední dávce se stav neukládá – výsledky hned zapíše
+                # _save_results a progress soubor se smaže
+                last_batch = future is None and not self.queue
+                if len(self._new_processed) >= self.PROGRESS_EVERY and not last_batch:
+                    self._save_progress()
+
+                if future is None:
+                    # Fronta byla při předstahování prázdná – zpracování
+                    # dávky do ní mohlo přidat specializace nebo opakování
+                    next_batch, future = prefetch()
+                batch = next_batch
+
+    def _next_batch(self) -> List[tuple]:
+        """Vybere z fronty až `concurrency` dosud nezpracovaných položek."""
+        batch = []
+        seen = set()
+        while self.queue and len(batch) < self.concurrency:
+            item = self.queue.popleft()
+            full_url = self._item_url(item)
+            if full_url in self.processed_urls or full_url in seen:
                 continue
+            seen.add(full_url)
+            batch.append((item, full_url))
+        return batch
 
-            soup = BeautifulSoup(resp.text, "html.parser")
-            page_type = self._detect_page_type(soup)
-
-            if page_type == "specializations":
-                new_items = self._extract_specializations(soup, item)
-                added = 0
-                for ni in new_items:
-                    ni_url = self._full_url(ni["url"])
-                    if ni_url not in self.processed_urls:
-                        self.queue.append(ni)
-                        added += 1
-                print(
-                    f"    → Rozcestník: přidáno {added} specializací do fronty"
+    def _fetch_batch(
+        self, urls: List[str]
+    ) -> Tuple[List[Optional[str]], Dict[str, List[str]]]:
+        """
+        Stáhne dávku URL a vrátí jejich HTML (None pro neúspěšné pokusy)
+        spolu s chybovými hláškami podle URL.
+
+        Jedna URL jde přes synchronní HttpClient, více URL souběžně přes
+        AsyncHttpClient. Smyčka událostí se používá vždy jen z jednoho
+        vlákna (stahovacího) a zavírá se až po jeho skončení.
+        """
+        errors: Dict[str, List[str]] = {}
+        self._fetch_errors = errors
+        try:
+            if len(urls) == 1:
+                resp = self.client.get(urls[0])
+                return [resp.text if resp else None], errors
+            if self._async_client is None:
+                self._loop = asyncio.new_event_loop()
+                self._async_client = AsyncHttpClient(
+                    delay_range=self.delay_range,
+                    max_retries=self.MAX_RETRIES,
+                    concurrency=self.concurrency,
+                    on_error=self._on_fetch_error,
                 )
+                self._loop.run_until_complete(self._async_client.__aenter__())
+            # Rozestupy sdílí oba klienti: dávka počká na interval od
+            # posledního synchronního požadavku a po ní se znovu započte
+            self.client.wait_turn()
+            pages = self._loop.run_until_complete(self._async_client.get_many(urls))
+            self.client.mark_request()
+            return pages, errors
+        finally:
+            self._fetch_errors = None
+
+    def _on_fetch_error(self, url: str, message: str) -> None:
+        """Chyba stažení – během dávky se odloží k její URL, jinak se vypíše."""
+        if self._fetch_errors is None:
+            print(message)
+        else:
+            self._fetch_errors.setdefault(url, []).append(message)
 
-            elif page_type == "study_plan":
-                subjects = self._extract_subjects_with_semesters(soup)
+    def _close_async_client(self) -> None:
+        """Zavře sdílený asynchronní klient a jeho smyčku událostí."""
+        if self._async_client is None:
+            return
+        try:
+            self._loop.run_until_complete(
+                self._async_client.__aexit__(None, None, None)
+            )
+        finally:
+            self._loop.close()
+            self._loop = None
+            self._async_client = None
+
+    def _process_page(self, item: Dict, full_url: str, html: str) -> None:
+        """Zpracuje stažený dokument jedné položky fronty."""
+        # Levný test nad surovým HTML: stránku bez tabulky nebo bez
+        # jakékoli stopy plánu není třeba parsovat do stromu.
+        if not self._may_be_plan(html):
+            print("    ? Neznámý typ stránky, žádné předměty nenalezeny")
+            return
+
+        soup = BeautifulSoup(html, _HTML_PARSER)
+        page_type, tables = self._detect_page_type(soup)
+
+        if page_type == "specializations":
+            new_items = self._extract_specializations(soup, item)
+            added = 0
+            for ni in new_items:
+                if self._enqueue(ni):
+                    added += 1
+            print(
+                f"    → Rozcestník: přidáno {added} specializací do fronty"
+            )
+
+        elif page_type == "study_plan":
+            subjects = self._extract_subjects_with_semesters(tables)
+            credits = self._extract_credits(soup)
+            result = {
+                "zkratka_fakulty": item["zkratka_fakulty"],
+                "fakulta": item["fakulta"],
+                "zkratka_programu": item["zkratka_programu"],
+                "nazev_programu": item["nazev_programu"],
+                "specializace": self._normalize_specialization(
+                    item.get("specializace", "")
+                ) or "Bez specializace",
+                "doba_studia": item.get("doba_studia", ""),
+                "typ_studia": item.get("typ_studia", ""),
+                "kredity": credits,
+                "url_planu": full_url,
+                "predmety": subjects,
+            }
+            self.results.append(result)
+            credits_info = f" ({credits} kreditů)" if credits else ""
+            print(f"    ✓ Extrahováno {len(subjects)} předmětů{credits_info}")
+
+        else:
+            subjects = self._extract_subjects_with_semesters(tables)
+            if subjects:
                 credits = self._extract_credits(soup)
                 result = {
                     "zkratka_fakulty": item["zkratka_fakulty"],
@@ -760,44 +1139,14 @@ class StudyPlanScraper:
                 }
                 self.results.append(result)
                 credits_info = f" ({credits} kreditů)" if credits else ""
-                print(f"    ✓ Extrahováno {len(subjects)} předmětů{credits_info}")
-
+                print(
+                    f"    ? Neznámý typ, ale nalezeno "
+                    f"{len(subjects)} předmětů{credits_info}"
+                )
             else:
-                subjects = self._extract_subjects_with_semesters(soup)
-                if subjects:
-                    credits = self._extract_credits(soup)
-                    result = {
-                        "zkratka_fakulty": item["zkratka_fakulty"],
-                        "fakulta": item["fakulta"],
-                        "zkratka_programu": item["zkratka_programu"],
-                        "nazev_programu": item["nazev_programu"],
-                        "specializace": self._normalize_specialization(
-                            item.get("specializace", "")
-                        ) or "Bez specializace",
-                        "doba_studia": item.get("doba_studia", ""),
-                        "typ_studia": item.get("typ_studia", ""),
-                        "kredity": credits,
-                        "url_planu": full_url,
-                        "predmety": subjects,
-                    }
-                    self.results.append(result)
-                    credits_info = f" ({credits} kreditů)" if credits else ""
-                    print(
-                        f"    ? Neznámý typ, ale nalezeno "
-                        f"{len(subjects)} předmětů{credits_info}"
-                    )
-                else:
-                    print(
-                        "    ? Neznámý typ stránky, žádné předměty nenalezeny"
-                    )
-
-            self.processed_urls.add(full_url)
-            self._save_progress()
-
-        print(
-            f"\n✓ Fáze 2 dokončena. "
-            f"Celkem {len(self.results)} studijních plánů."
-        )
+                print(
+                    "    ? Neznámý typ stránky, žádné předměty nenalezeny"
+                )
 
     # ------------------------------------------------------------------
     # Hlavní orchestrace
@@ -820,6 +1169,10 @@ class StudyPlanScraper:
         if not loaded or not self.queue:
             self.queue.clear()
             self.processed_urls.clear()
+            self.queued_urls.clear()
+            self._new_processed.clear()
+            self._processed_size = 0
+            self._pending.clear()
             self.results.clear()
             self.phase1_discover()
 
@@ -830,25 +1183,26 @@ class StudyPlanScraper:
         if os.path.exists(self.progress_file):
             os.remove(self.progress_file)
             print("✓ Progress soubor odstraněn (scraping dokončen).")
+        if os.path.exists(self.processed_file):
+            os.remove(self.processed_file)
 
         return self.results
 
     def _print_statistics(self) -> None:
         """Vypíše statistiky o získaných datech."""
-        total_subjects = sum(len(r["predmety"]) for r in self.results)
-        faculties = set(r["zkratka_fakulty"] for r in self.results)
+        # Jediný průchod výsledky – součty i počet fakult plynou z fac_counts
+        fac_counts: Dict[str, int] = {}
+        for r in self.results:
+            key = r["zkratka_fakulty"]
+            fac_counts[key] = fac_counts.get(key, 0) + len(r["predmety"])
 
         print("\n" + "=" * 70)
         print("STATISTIKY:")
         print(f"  Studijních plánů: {len(self.results)}")
-        print(f"  Předmětů celkem:  {total_subjects}")
-        print(f"  Fakult:           {len(faculties)}")
+        print(f"  Předmětů celkem:  {sum(fac_counts.values())}")
+        print(f"  Fakult:           {len(fac_counts)}")
         print()
 
-        fac_counts: Dict[str, int] = {}
-        for r in self.results:
-            key = r["zkratka_fakulty"]
-            fac_counts[key] = fac_counts.get(key, 0) + len(r["predmety"])
         for fac, cnt in sorted(fac_counts.items()):
             print(f"    {fac}: {cnt} předmětů")
         print("=" * 70)
@@ -864,19 +1218,14 @@ def _min_rocnik(a: str, b: str) -> str:
 
     Numerické hodnoty mají přednost před „libovolný".
     """
-    if not a:
+    # Nejčastější případ – předmět ve více semestrech téhož ročníku
+    if not a or a == b:
         return b
     if not b:
         return a
-    a_is_num = a.isdigit()
-    b_is_num = b.isdigit()
-    if a_is_num and b_is_num:
-        return str(min(int(a), int(b)))
-    if a_is_num:
-        return a
-    if b_is_num:
-        return b
-    return a  # oba „libovolný"
+    if a.isdigit():
+        return b if b.isdigit() and int(b) < int(a) else a
+    return b if b.isdigit() else a  # a je „libovolný"
 
 
 # ---------------------------------------------------------------------------
@@ -914,17 +1263,26 @@ def main():
         default=5.0,
         help="Maximální zpoždění mezi požadavky v sekundách (default: 5.0)",
     )
+    parser.add_argument(
+        "--concurrency",
+        "-c",
+        type=int,
+        default=1,
+        help="Počet souběžně stahovaných stránek (default: 1)",
+    )
     args = parser.parse_args()
 
     print("VUT Study Plan Scraper")
     print(f"Jazyk: {args.language}")
     print(f"Delay: {args.delay_min}–{args.delay_max}s")
     print(f"Resume: {'ano' if not args.no_resume else 'ne'}")
+    print(f"Souběžnost: {args.concurrency}")
     print()
 
     scraper = StudyPlanScraper(
         language=args.language,
         delay_range=(args.delay_min, args.delay_max),
+        concurrency=args.concurrency,
     )
 
     scraper.run(resume=not args.no_resume)